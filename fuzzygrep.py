@@ -1,3 +1,4 @@
+import orjson
 import json
 import csv
 from rapidfuzz import process, fuzz
@@ -12,16 +13,23 @@ from prompt_toolkit import PromptSession
 from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.key_binding import KeyBindings
 import os
-import subprocess
 import collections
+import functools
 import tempfile
 import logging
+import re
 import sys
 import atexit
+import bisect
+import itertools
+import threading
 import termgraph.termgraph as termgraph
 
 app = typer.Typer()
 
+# orjson only keeps integers that fit in 64 bits and turns wider ones into floats; any run of 19+ digits may be one
+_WIDE_NUMBER = re.compile(rb"\d{19}")
+
 # Setup logging
 log_file_path = None
 logger = logging.getLogger(__name__)
@@ -59,51 +67,125 @@ class FuzzyJSONSearcher:
         self.data = None
         self.unique_keys = []
         self._allowed_keys_filter = [] # New attribute for key filtering
+        self._applied_keys_filter = [] # Filter unique_keys was last built from
         self._load_data()
 
     def _load_data(self):
         ext = self.file_path.suffix.lower()
         if ext == '.json':
             self.data = self._load_json()
-            if self.data:
-                self._all_keys = self._extract_json_keys(self.data)
-                self._all_values = self._extract_json_values(self.data)
         elif ext == '.csv':
             self.data = self._load_csv()
-            if self.data:
-                self._all_keys = list(self.data[0].keys()) if self.data else []
-                self._all_values = [] # CSVs don't have nested values in the same way
+        # The path index is all the key side needs; value lists and maps are derived from it on first use
+        self._columnar = ext == '.csv' and self.data is not None
+        if self._columnar:
+            # The columns already are the path index; there is no tree to walk
+            self._path_to_values = self.data
+            self._key_counts = collections.Counter(self.data.keys())
+        else:
+            self._path_to_values = self._walk(self.data)
+            # A path occurs once per value recorded for it, so the index already holds the key histogram
+            self._key_counts = collections.Counter({path: len(vals) for path, vals in self._path_to_values.items()})
         self._apply_key_filter()
 
+    @functools.cached_property
+    def _value_index(self):
+        """Builds the leaf value list and the full value-to-keys map from the path index, once per load."""
+        if self._columnar:
+            # CSVs don't have nested values in the same way
+            return [], self._build_column_value_map(self.data)
+        values = []
+        value_to_keys = collections.defaultdict(set)
+        # Enum-like leaves repeat heavily; keep one string per distinct value
+        seen_values = {}
+        for path, nodes in self._path_to_values.items():
+            for node in nodes:
+                if isinstance(node, (dict, list)):
+                    continue
+                val_str = str(node)
+                val_str = seen_values.setdefault(val_str, val_str)
+                values.append(val_str)
+                value_to_keys[val_str].add(path)
+        return values, {val: list(paths) for val, paths in value_to_keys.items()}
+
+    @property
+    def _all_values(self):
+        return self._value_index[0]
+
+    @property
+    def _full_value_to_keys_map(self):
+        return self._value_index[1]
+
+    @functools.cached_property
+    def _key_to_values(self):
+        """Reverse of the value map, so /only only visits the values of the keys it keeps."""
+        key_to_values = collections.defaultdict(list)
+        for val, keys in self._full_value_to_keys_map.items():
+            for key in keys:
+                key_to_values[key].append(val)
+        return key_to_values
+
+    @property
+    def value_to_keys_map(self):
+        """Value-to-keys map for the current /only filter, built the first time values are searched or shown."""
+        if self._value_to_keys_map is None:
+            if not self._allowed_keys_filter:
+                self._value_to_keys_map = self._full_value_to_keys_map
+            else:
+                # Rebuild value_to_keys_map from the values of the allowed keys only
+                filtered_value_to_keys_map = collections.defaultdict(list)
+                for key in self.unique_keys:
+                    for val in self._key_to_values.get(key, ()):
+                        filtered_value_to_keys_map[val].append(key)
+                self._value_to_keys_map = filtered_value_to_keys_map
+        return self._value_to_keys_map
+
+    @property
+    def unique_values(self):
+        if self._unique_values is None:
+            if not self._allowed_keys_filter:
+                # dict.fromkeys dedupes in one pass and keeps the order values were first seen
+                self._unique_values = list(dict.fromkeys(self._all_values))
+            else:
+                self._unique_values = list(self.value_to_keys_map)
+        return self._unique_values
+
     def _apply_key_filter(self):
         if not self._allowed_keys_filter:
-            self.unique_keys = sorted(list(set(self._all_keys)))
-            self.unique_values = sorted(list(set(self._all_values)))
-            self.value_to_keys_map = self._build_value_to_key_map(self.data)
+            # Discovery order; nothing here needs alphabetical order
+            self.unique_keys = list(self._key_counts)
         else:
-            filtered_keys = []
-            for key in self._all_keys:
-                for pattern in self._allowed_keys_filter:
-                    if pattern in key: # Simple substring match for now
-                        filtered_keys.append(key)
-                        break
-            self.unique_keys = sorted(list(set(filtered_keys)))
-
-            # Rebuild value_to_keys_map and unique_values based on filtered keys
-            filtered_value_to_keys_map = {}
-            for val, keys in self._build_value_to_key_map(self.data).items():
-                filtered_associated_keys = [k for k in keys if k in self.unique_keys]
-                if filtered_associated_keys:
-                    filtered_value_to_keys_map[val] = filtered_associated_keys
-            self.value_to_keys_map = filtered_value_to_keys_map
-            self.unique_values = sorted(list(filtered_value_to_keys_map.keys()))
+            # Simple substring match for now, as one alternation so each key is scanned once inside re
+            pattern = re.compile("|".join(re.escape(p) for p in self._allowed_keys_filter))
+            # Patterns are OR'ed, so dropping some of them can only narrow the match; search the current keys then
+            if self._applied_keys_filter and set(self._allowed_keys_filter) <= set(self._applied_keys_filter):
+                candidate_keys = self.unique_keys
+            else:
+                candidate_keys = self._key_counts
+            filtered_keys = list(filter(pattern.search, candidate_keys))
+            self.unique_keys = filtered_keys
+        self._applied_keys_filter = list(self._allowed_keys_filter)
+        # Key-only sessions never search values; both are rebuilt for the new filter on first access
+        self._value_to_keys_map = None
+        self._unique_values = None
+        # Completions rescore on every keystroke, often for text just seen; a new filter starts a fresh cache
+        self._search_cache = functools.lru_cache(maxsize=512)(self._score)
+        # Alphabetical copy of unique_keys for prefix_search, built on first use
+        self._sorted_keys = None
 
     def _load_json(self):
         """Loads a JSON file with error handling."""
         try:
-            with open(self.file_path, 'r') as f:
-                data = json.load(f)
-            return data
+            with open(self.file_path, 'rb') as f:
+                raw = f.read()
+            if _WIDE_NUMBER.search(raw):
+                # json keeps such integers exact
+                return json.loads(raw)
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                # json also accepts NaN and Infinity, which orjson rejects
+                return json.loads(raw)
         except FileNotFoundError:
             logger.error(f"File not found at '{self.file_path}'")
             return None
@@ -112,11 +194,29 @@ class FuzzyJSONSearcher:
             return None
 
     def _load_csv(self):
-        """Loads a CSV file with error handling."""
+        """Loads a CSV file column-wise, as a map from each column name to its values, with error handling."""
         try:
             with open(self.file_path, newline='') as f:
-                reader = csv.DictReader(f)
-                return list(reader)
+                reader = csv.reader(f)
+                header = next(reader, [])
+                width = len(header)
+                columns = [[] for _ in header]
+                appends = [column.append for column in columns]
+                long_rows = 0
+                for row in reader:
+                    if not row:
+                        # Blank lines are skipped, as csv.DictReader does
+                        continue
+                    if len(row) < width:
+                        # Missing fields read as None, as csv.DictReader fills them, so every column keeps one value per row
+                        row += [None] * (width - len(row))
+                    elif len(row) > width:
+                        long_rows += 1
+                    for append, value in zip(appends, row):
+                        append(value)
+                if long_rows:
+                    logger.warning(f"Ignored extra fields on {long_rows} row(s) of '{self.file_path}' beyond its {width} columns")
+                return dict(zip(header, columns))
         except FileNotFoundError:
             logger.error(f"File not found at '{self.file_path}'")
             return None
@@ -124,93 +224,78 @@ class FuzzyJSONSearcher:
             logger.error(f"Error reading CSV file '{self.file_path}': {e}")
             return None
 
-    def _extract_json_keys(self, data, prefix=""):
-        """Recursively extracts all keys from a nested JSON object, creating dot-notation paths."""
-        keys = []
-        if isinstance(data, dict):
-            for k, v in data.items():
-                full_key = f"{prefix}.{k}" if prefix else k
-                keys.append(full_key)
-                keys.extend(self._extract_json_keys(v, prefix=full_key))
-        elif isinstance(data, list):
-            for item in data:
-                keys.extend(self._extract_json_keys(item, prefix=prefix))
-        return keys
-
-    def _extract_json_values(self, data):
-        """Recursively extracts all values from a nested JSON object."""
-        values = []
-        if isinstance(data, dict):
-            for k, v in data.items():
-                if isinstance(v, (dict, list)):
-                    values.extend(self._extract_json_values(v))
-                else:
-                    values.append(str(v))
-        elif isinstance(data, list):
-            for item in data:
-                values.extend(self._extract_json_values(item))
-        return values
-
-    def _get_values_by_path(self, data, path):
-        """Recursively retrieves all values for a given path from nested data."""
-        values = []
-        if isinstance(data, list):
-            for item in data:
-                values.extend(self._get_values_by_path(item, path))
-            return values
-
-        keys = path.split('.')
-        value = data
-        for key in keys:
-            try:
-                if isinstance(value, dict):
-                    value = value[key]
-                elif isinstance(value, list):
-                    # This case is handled by the initial list check
-                    return []
-                else:
-                    return []
-            except (KeyError, TypeError, IndexError):
-                return []
-        return [value]
-
-    def _build_value_to_key_map(self, data, prefix=""):
-        """Recursively builds a map from values to the keys that contain them."""
-        value_to_keys = {}
-        if isinstance(data, dict):
-            for k, v in data.items():
-                full_key = f"{prefix}.{k}" if prefix else k
-                if isinstance(v, (dict, list)):
-                    nested_map = self._build_value_to_key_map(v, prefix=full_key)
-                    for val, keys in nested_map.items():
-                        if val not in value_to_keys:
-                            value_to_keys[val] = set()
-                        value_to_keys[val].update(keys)
-                else:
-                    val_str = str(v)
-                    if val_str not in value_to_keys:
-                        value_to_keys[val_str] = set()
-                    value_to_keys[val_str].add(full_key)
-        elif isinstance(data, list):
-            for item in data:
-                nested_map = self._build_value_to_key_map(item, prefix=prefix)
-                for val, keys in nested_map.items():
-                    if val not in value_to_keys:
-                        value_to_keys[val] = set()
-                    value_to_keys[val].update(keys)
-
-        return {val: sorted(list(keys)) for val, keys in value_to_keys.items()}
+    def _walk(self, data):
+        """Walks a nested JSON object once, collecting a map from each dot-notation key to the values found at it."""
+        path_to_values = collections.defaultdict(list)
+        # Entries are (path, node, is_key); dict members are pushed with is_key so their path is recorded when visited.
+        # Children are pushed in reverse so they are visited in document order.
+        stack = []
+        # Top-level rows (the dict itself, or each item of a top-level list) are handled inline: in the common
+        # list-of-flat-dicts shape their fields are leaves keyed by the bare field name and never touch the stack
+        for row in (data if isinstance(data, list) else [data]):
+            if isinstance(row, dict):
+                fields = iter(row.items())
+                for k, v in fields:
+                    if isinstance(v, (dict, list)):
+                        # Hand this field and the rest of the row to the stack to keep document order
+                        rest = [(k, v), *fields]
+                        for field, value in reversed(rest):
+                            stack.append((sys.intern(field), value, True))
+                        break
+                    path_to_values[sys.intern(k)].append(v)
+            else:
+                stack.append(("", row, False))
+            while stack:
+                path, node, is_key = stack.pop()
+                if is_key:
+                    path_to_values[path].append(node)
+                if isinstance(node, dict):
+                    for k, v in reversed(node.items()):
+                        # The same path recurs for every list item; interning keeps one copy and makes set/dict lookups cheap
+                        stack.append((sys.intern(f"{path}.{k}" if path else k), v, True))
+                elif isinstance(node, list):
+                    for item in reversed(node):
+                        stack.append((path, item, False))
+        return path_to_values
+
+    def _build_column_value_map(self, columns):
+        """Builds a map from values to the CSV columns that contain them."""
+        value_to_keys = collections.defaultdict(list)
+        for column, values in columns.items():
+            # Each column is visited once, so deduplicating its values is enough to keep the key lists distinct.
+            # Values are strings except the None padding of short rows, which is keyed as 'None' like JSON leaves.
+            for val in dict.fromkeys(map(str, values)):
+                value_to_keys[val].append(column)
+        return value_to_keys
+
+    def _get_values_by_path(self, path):
+        """Retrieves all values for a given path, including those under nested lists, from the index built by _walk."""
+        return self._path_to_values.get(path, ())
 
     def fuzzy_search(self, query: str, limit: int = 10, search_type: str = "keys"):
         """Finds close matches for a query from a list of candidates using fuzzywuzzy."""
-        if search_type == "keys":
-            candidates = self.unique_keys
-        else: # search_type == "values"
-            candidates = self.unique_values
-        matches = process.extract(query, candidates, scorer=fuzz.WRatio, limit=limit, score_cutoff=60)
-
-        cleaned = [(m[0], m[1]) for m in matches]
-        return cleaned
+        return list(self._search_cache(query, limit, search_type))
+
+    def prefix_search(self, prefix: str, limit: int = 10):
+        """Finds keys starting with prefix by binary search over the alphabetically sorted keys."""
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self.unique_keys)
+        start = bisect.bisect_left(self._sorted_keys, prefix)
+        matches = []
+        for key in itertools.islice(self._sorted_keys, start, start + limit):
+            if not key.startswith(prefix):
+                break
+            matches.append(key)
+        return matches
+
+    def _score(self, query: str, limit: int, search_type: str):
+        """Scores the candidates for search_type against query. Called through _search_cache."""
+        # Picked by search type on every query and keystroke; unique_values is only built once values are searched
+        candidates = self.unique_keys if search_type == "keys" else self.unique_values
+        # processor=None is rapidfuzz 3's default, spelled out so candidates are never re-normalized per keystroke
+        matches = process.extract(query, candidates, scorer=fuzz.WRatio, processor=None, limit=limit, score_cutoff=60)
+
+        return tuple((m[0], m[1]) for m in matches)
 
     def display_matches(self, matches, search_type: str = "keys"):
         if not matches:
@@ -232,7 +317,7 @@ class FuzzyJSONSearcher:
 
         for m, score in matches:
             if search_type == "keys":
-                values = self._get_values_by_path(self.data, m)
+                values = self._get_values_by_path(m)
                 if values:
                     is_nested = any(isinstance(v, (dict, list)) for v in values)
                     if is_nested:
@@ -243,7 +328,8 @@ class FuzzyJSONSearcher:
             else: # search_type == "values"
                 keys = self.value_to_keys_map.get(m, [])
                 if keys:
-                    table.add_row(m, ", ".join(keys), str(score))
+                    # Only the displayed matches are sorted
+                    table.add_row(m, ", ".join(sorted(keys)), str(score))
 
         if table.rows:
             if len(matches) > 20: # Threshold for pagination
@@ -282,6 +368,79 @@ def generate_rich_tree(data, parent_tree=None, name="root"):
                 tree.add(f"- [green]{item}[/green]")
     return tree
 
+def print_histogram(counts: collections.Counter, color: str, top: int = 20):
+    """Draws a horizontal bar chart of the most common entries in counts with termgraph."""
+    labels = []
+    data = []
+    for label, count in counts.most_common(top):
+        labels.append(str(label))
+        data.append([count])
+
+    # Mirrors the defaults of termgraph's command-line parser
+    args = {
+        "filename": "-", "title": None, "width": 50, "format": "{:<5.2f}", "suffix": "",
+        "no_labels": False, "no_values": False, "space_between": False, "color": [color],
+        "vertical": False, "stacked": False, "histogram": False, "bins": 5,
+        "different_scale": False, "calendar": False, "start_dt": None, "custom_tick": "",
+        "delim": "", "verbose": False, "label_before": False, "version": False,
+    }
+    colors = termgraph.check_data(labels, data, args)
+    termgraph.chart(colors, data, args, labels)
+
+class BackgroundLoader:
+    """Builds a FuzzyJSONSearcher on a worker thread so the prompt stays responsive while a file loads.
+
+    Records the worker logs to log_handler are held back until release_held_records, so nothing is written
+    over the prompt while it is being drawn."""
+
+    def __init__(self, log_handler: Optional[logging.Handler] = None):
+        self._thread = None
+        self._result = None
+        self._log_handler = log_handler
+        self._held_records = []
+        self.ready = threading.Event()
+        if log_handler is not None:
+            log_handler.addFilter(self._hold_worker_record)
+
+    @property
+    def loading(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, file_path: Path):
+        self.ready.clear()
+        self._result = None
+        self._thread = threading.Thread(target=self._run, args=(file_path,), daemon=True)
+        self._thread.start()
+
+    def _run(self, file_path: Path):
+        try:
+            self._result = FuzzyJSONSearcher(file_path)
+        except Exception as e:
+            # Handed to the main loop by poll instead of printing a traceback over the prompt
+            self._result = e
+        finally:
+            self.ready.set()
+
+    def _hold_worker_record(self, record):
+        if self._thread is not None and record.thread == self._thread.ident:
+            self._held_records.append(record)
+            return False
+        return True
+
+    def release_held_records(self):
+        """Emits the records held back from the worker. Call only while no prompt is drawn."""
+        records, self._held_records = self._held_records, []
+        for record in records:
+            self._log_handler.emit(record)
+
+    def poll(self):
+        """Returns the loaded searcher, or the exception the load raised, once it is ready, otherwise None."""
+        if not self.ready.is_set():
+            return None
+        self.ready.clear()
+        result, self._result = self._result, None
+        return result
+
 class FuzzyCompleter(Completer):
     def __init__(self, searcher: "FuzzyJSONSearcher", completion_type: str = "keys"):
         self.searcher = searcher
@@ -290,14 +449,14 @@ class FuzzyCompleter(Completer):
     def get_completions(self, document, complete_event):
         text = document.text_before_cursor
         if text:
-            if self.completion_type == "keys":
-                candidates = self.searcher.unique_keys
-            else: # completion_type == "values"
-                candidates = self.searcher.unique_values
-
-            matches = process.extract(text, candidates, scorer=fuzz.WRatio, limit=5, score_cutoff=60)
-            cleaned = [(m[0], m[1]) for m in matches]
-            for m, score in cleaned:
+            # One or two characters say little to a fuzzy scorer; a key prefix is almost always what is meant
+            if self.completion_type == "keys" and len(text) < 3:
+                matches = self.searcher.prefix_search(text, limit=5)
+                if matches:
+                    for m in matches:
+                        yield Completion(m, start_position=-len(text))
+                    return
+            for m, score in self.searcher.fuzzy_search(text, limit=5, search_type=self.completion_type):
                 yield Completion(m, start_position=-len(text))
 
 class CommandCompleter(Completer):
@@ -310,11 +469,24 @@ class CommandCompleter(Completer):
                     yield Completion(cmd, start_position=-len(text))
 
 class DynamicCompleter(Completer):
-    def __init__(self, fuzzy_completer, command_completer):
+    def __init__(self, fuzzy_completer, command_completer, loader=None):
         self.fuzzy_completer = fuzzy_completer
         self.command_completer = command_completer
+        self.loader = loader
+        self.load_error = None
+
+    def refresh_searcher(self):
+        """Swaps in a searcher finished by the background loader, if there is one. A failed load is kept in
+        load_error for the main loop to report."""
+        if self.loader is not None:
+            result = self.loader.poll()
+            if isinstance(result, Exception):
+                self.load_error = result
+            elif result is not None:
+                self.fuzzy_completer.searcher = result
 
     def get_completions(self, document, complete_event):
+        self.refresh_searcher()
         text = document.text_before_cursor
         if text.startswith('/'):
             yield from self.command_completer.get_completions(document, complete_event)
@@ -346,34 +518,18 @@ def main(
 
     if histogram:
         if searcher.data:
-            key_counts = collections.Counter(searcher._all_keys)
+            key_counts = searcher._key_counts
             value_counts = collections.Counter(searcher._all_values)
 
             logger.info("\nKey Histogram:")
             if key_counts:
-                with tempfile.NamedTemporaryFile(mode='w+', delete=False) as temp_key_file:
-                    for k, v in key_counts.most_common(20):
-                        temp_key_file.write(f"{k},{v}\n")
-                try:
-                    subprocess.run(["termgraph", temp_key_file.name, "--width", "50", "--format", "{:<5.2f}", "--suffix", "", "--color", "blue"], check=True)
-                except subprocess.CalledProcessError as e:
-                    logger.error(f"Error generating key histogram: {e}")
-                finally:
-                    os.remove(temp_key_file.name)
+                print_histogram(key_counts, color="blue")
             else:
                 logger.info("No keys found for histogram.")
 
             logger.info("\nValue Histogram:")
             if value_counts:
-                with tempfile.NamedTemporaryFile(mode='w+', delete=False) as temp_value_file:
-                    for k, v in value_counts.most_common(20):
-                        temp_value_file.write(f"{k},{v}\n")
-                try:
-                    subprocess.run(["termgraph", temp_value_file.name, "--width", "50", "--format", "{:<5.2f}", "--suffix", "", "--color", "green"], check=True)
-                except subprocess.CalledProcessError as e:
-                    logger.error(f"Error generating value histogram: {e}")
-                finally:
-                    os.remove(temp_value_file.name)
+                print_histogram(value_counts, color="green")
             else:
                 logger.info("No values found for histogram.")
         else:
@@ -404,13 +560,23 @@ def main(
 
     fuzzy_completer = FuzzyCompleter(searcher, completion_type=current_completion_type)
     command_completer = CommandCompleter()
-    dynamic_completer = DynamicCompleter(fuzzy_completer, command_completer)
+    loader = BackgroundLoader(log_handler=console_handler)
+    dynamic_completer = DynamicCompleter(fuzzy_completer, command_completer, loader=loader)
 
     session = PromptSession(completer=dynamic_completer, complete_while_typing=True, key_bindings=kb)
 
     while True:
         try:
             query = session.prompt(f"\n[{file_path.name}] Search> ")
+            # Completions keep using the old searcher until a /load finishes in the background
+            dynamic_completer.refresh_searcher()
+            loader.release_held_records()
+            if dynamic_completer.load_error is not None:
+                logger.error(f"Could not load file: {dynamic_completer.load_error}")
+                dynamic_completer.load_error = None
+            if fuzzy_completer.searcher is not searcher:
+                searcher = fuzzy_completer.searcher
+                logger.info(f"Loaded '{searcher.file_path}'. Found {len(searcher.unique_keys)} keys/columns.")
             if not query:
                 logger.info("Empty query, continuing...")
                 continue
@@ -423,10 +589,11 @@ def main(
                     parts = query.split()
                     if len(parts) > 1:
                         new_file_path = Path(parts[1])
-                        if new_file_path.exists():
-                            searcher = FuzzyJSONSearcher(new_file_path)
-                            fuzzy_completer.searcher = searcher
-                            logger.info(f"Loaded '{new_file_path}'. Found {len(searcher.unique_keys)} keys/columns.")
+                        if loader.loading:
+                            logger.info("Another file is still loading, try again once it is ready.")
+                        elif new_file_path.exists():
+                            loader.start(new_file_path)
+                            logger.info(f"Loading '{new_file_path}' in the background...")
                         else:
                             logger.error(f"File not found at '{new_file_path}'")
                     else: